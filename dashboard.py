@@ -8,12 +8,14 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import sqlite3
+from contextlib import closing
 from datetime import datetime, timedelta
-import time
+from streamlit_autorefresh import st_autorefresh
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -22,37 +24,180 @@ st.set_page_config(
     layout="wide"
 )
 
+DB_PATH = 'trading_history.db'
+
+def stats_add_sql(row):
+    # Tambahkan kontribusi satu trade tertutup (profit terisi) ke agent_stats
+    return f"""
+        INSERT INTO agent_stats (agent_name, total_trades, wins, total_profit, sum_confidence, confidence_count)
+        SELECT {row}.agent_name, 1, {row}.profit > 0, {row}.profit,
+               COALESCE({row}.confidence, 0), {row}.confidence IS NOT NULL
+        WHERE {row}.profit IS NOT NULL AND {row}.agent_name IS NOT NULL
+        ON CONFLICT(agent_name) DO UPDATE SET
+            total_trades = total_trades + 1,
+            wins = wins + excluded.wins,
+            total_profit = total_profit + excluded.total_profit,
+            sum_confidence = sum_confidence + excluded.sum_confidence,
+            confidence_count = confidence_count + excluded.confidence_count;
+    """
+
+def stats_remove_sql(row):
+    # Kurangi kontribusi trade lama (untuk UPDATE/DELETE di tabel trades)
+    return f"""
+        UPDATE agent_stats SET
+            total_trades = total_trades - 1,
+            wins = wins - ({row}.profit > 0),
+            total_profit = total_profit - {row}.profit,
+            sum_confidence = sum_confidence - COALESCE({row}.confidence, 0),
+            confidence_count = confidence_count - ({row}.confidence IS NOT NULL)
+        WHERE agent_name = {row}.agent_name AND {row}.profit IS NOT NULL;
+    """
+
+def setup_agent_stats(db, tables):
+    # Agregat per agent dipelihara trigger, jadi leaderboard tidak perlu GROUP BY seluruh trades
+    db.execute("BEGIN IMMEDIATE")
+    if 'agent_stats' not in tables:
+        db.execute("""
+        CREATE TABLE agent_stats (
+            agent_name TEXT PRIMARY KEY,
+            total_trades INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            total_profit REAL NOT NULL DEFAULT 0,
+            sum_confidence REAL NOT NULL DEFAULT 0,
+            confidence_count INTEGER NOT NULL DEFAULT 0
+        )
+        """)
+        # Isi awal dari trade yang sudah ada
+        db.execute("""
+        INSERT INTO agent_stats
+        SELECT agent_name,
+               COUNT(*),
+               SUM(CASE WHEN profit > 0 THEN 1 ELSE 0 END),
+               SUM(profit),
+               COALESCE(SUM(confidence), 0),
+               COUNT(confidence)
+        FROM trades
+        WHERE profit IS NOT NULL AND agent_name IS NOT NULL
+        GROUP BY agent_name
+        """)
+    db.execute(f"CREATE TRIGGER IF NOT EXISTS trades_stats_ai AFTER INSERT ON trades BEGIN {stats_add_sql('NEW')} END")
+    db.execute(f"CREATE TRIGGER IF NOT EXISTS trades_stats_ad AFTER DELETE ON trades BEGIN {stats_remove_sql('OLD')} END")
+    db.execute(
+        "CREATE TRIGGER IF NOT EXISTS trades_stats_au AFTER UPDATE OF agent_name, profit, confidence ON trades "
+        f"BEGIN {stats_remove_sql('OLD')} {stats_add_sql('NEW')} END"
+    )
+    db.commit()
+
+def setup_database():
+    # Setup lewat koneksi tulis singkat (butuh akses tulis ke file database bot):
+    # journal_mode WAL tersimpan di file database, sehingga pembacaan dashboard
+    # tidak saling mengunci dengan penulisan bot. closing() menutup koneksi
+    # (dan membatalkan transaksi yang belum commit) walau ada statement yang gagal.
+    with closing(sqlite3.connect(DB_PATH)) as setup_conn:
+        setup_conn.execute("PRAGMA journal_mode=WAL")
+
+        # Index untuk ORDER BY timestamp dan GROUP BY agent_name (hanya jika tabel sudah dibuat bot)
+        tables = {row[0] for row in setup_conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        if 'trades' in tables:
+            setup_conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_ts ON trades(timestamp DESC)")
+            setup_conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_agent ON trades(agent_name, profit)")
+            setup_agent_stats(setup_conn, tables)
+        if 'market_sentiment' in tables:
+            setup_conn.execute("CREATE INDEX IF NOT EXISTS idx_sentiment_ts ON market_sentiment(timestamp DESC)")
+        setup_conn.commit()
+        # Nama tabel dan index yang ada setelah setup, untuk dicek ensure_db_setup
+        return {row[0] for row in setup_conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'index')")}
+
+@st.cache_resource
+def ensure_db_setup():
+    # Hanya di-cache bila setup lengkap: exception tidak di-cache oleh st.cache_resource,
+    # jadi setup dicoba lagi di run berikutnya (mis. bot belum membuat tabel trades
+    # atau market_sentiment). Dicek lewat nama index, bukan tabel, karena tabel bisa
+    # dibuat bot setelah langkah index dilewati.
+    missing = {'agent_stats', 'idx_sentiment_ts'} - setup_database()
+    if missing:
+        raise RuntimeError(f"Setup database belum lengkap: {', '.join(sorted(missing))}")
+    return True
+
+try:
+    ensure_db_setup()
+except (RuntimeError, sqlite3.OperationalError):
+    # Belum siap atau database sedang dikunci bot; leaderboard memakai query GROUP BY dulu
+    pass
+
 # Koneksi ke database yang sama dengan bot
 @st.cache_resource
 def get_db_connection():
-    return sqlite3.connect('trading_history.db', check_same_thread=False)
+    # Dashboard hanya membaca: koneksi read-only + mmap
+    conn = sqlite3.connect(f'file:{DB_PATH}?mode=ro', uri=True, check_same_thread=False)
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA query_only=1")
+    return conn
 
 conn = get_db_connection()
 
+# Batas titik per chart sebelum data di-resample
+MAX_CHART_POINTS = 2000
+
 # =================== FUNGSI LOAD DATA ===================
+def fetch_small_df(query):
+    # Untuk hasil kecil (<=100 baris): langsung fetchall, tanpa overhead read_sql_query
+    cur = conn.execute(query)
+    return pd.DataFrame.from_records(
+        cur.fetchall(), columns=[d[0] for d in cur.description], coerce_float=True
+    )
+
 @st.cache_data(ttl=10)  # refresh setiap 10 detik
 def load_trades():
     query = """
-    SELECT id, timestamp, symbol, action, entry, sl, tp, exit_price, profit, 
-           reason, agent_name, confidence
+    SELECT id, timestamp, symbol, action,
+           ROUND(entry, 2) as entry, ROUND(sl, 2) as sl, ROUND(tp, 2) as tp,
+           ROUND(exit_price, 2) as exit_price, ROUND(profit, 0) as profit,
+           reason, agent_name, ROUND(confidence, 2) as confidence
     FROM trades 
     ORDER BY timestamp DESC 
     LIMIT 100
     """
-    return pd.read_sql_query(query, conn)
+    # Dikembalikan dalam dtype Arrow agar serialisasi ke st.dataframe tidak lewat objek Python
+    df = fetch_small_df(query).convert_dtypes(dtype_backend='pyarrow')
+    df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601').astype('timestamp[ns][pyarrow]')
+    # Kolom berulang dengan sedikit nilai unik disimpan sebagai category
+    df[['action', 'agent_name']] = df[['action', 'agent_name']].astype('category')
+    return df
 
 @st.cache_data(ttl=60)
 def load_agent_performance():
+    has_stats = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='agent_stats'"
+    ).fetchone()
+    if has_stats is None:
+        # Fallback selama agent_stats belum dibuat setup
+        query = """
+        SELECT agent_name, 
+               COUNT(*) as total_trades,
+               SUM(CASE WHEN profit > 0 THEN 1 ELSE 0 END) as wins,
+               SUM(profit) as total_profit,
+               AVG(profit) as avg_profit,
+               AVG(confidence) as avg_confidence,
+               SUM(CASE WHEN profit > 0 THEN 1 ELSE 0 END) * 100.0 / NULLIF(COUNT(*), 0) as win_rate
+        FROM trades 
+        WHERE profit IS NOT NULL
+        GROUP BY agent_name
+        ORDER BY total_profit DESC
+        """
+        return pd.read_sql_query(query, conn)
+
     query = """
     SELECT agent_name, 
-           COUNT(*) as total_trades,
-           SUM(CASE WHEN profit > 0 THEN 1 ELSE 0 END) as wins,
-           SUM(profit) as total_profit,
-           AVG(profit) as avg_profit,
-           AVG(confidence) as avg_confidence
-    FROM trades 
-    WHERE profit IS NOT NULL
-    GROUP BY agent_name
+           total_trades,
+           wins,
+           total_profit,
+           total_profit / total_trades as avg_profit,
+           sum_confidence / NULLIF(confidence_count, 0) as avg_confidence,
+           wins * 100.0 / total_trades as win_rate
+    FROM agent_stats 
+    WHERE total_trades > 0
+    ORDER BY total_profit DESC
     """
     return pd.read_sql_query(query, conn)
 
@@ -65,18 +210,151 @@ def load_sentiment_history():
     ORDER BY timestamp DESC 
     LIMIT 50
     """
-    return pd.read_sql_query(query, conn)
-
+    df = fetch_small_df(query)
+    # Parsing waktu dan mapping signal ke angka ikut di-cache
+    df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601')
+    signal_map = {'BULLISH': 1, 'NEUTRAL': 0, 'BEARISH': -1}
+    df['signal_value'] = df['sentiment_signal'].map(signal_map).fillna(0).astype('int8')
+    df[['sentiment_signal', 'fundamental_signal']] = df[['sentiment_signal', 'fundamental_signal']].astype('category')
+    return df.sort_values('timestamp')
+
+@st.cache_data(ttl=10)
 def get_equity_curve():
+    # Kumulatif dihitung di pandas (prefix-sum), tanpa window function di SQL
     query = """
-    SELECT timestamp, 
-           SUM(profit) OVER (ORDER BY timestamp) as cumulative_profit
+    SELECT timestamp, profit
     FROM trades 
     WHERE profit IS NOT NULL
     ORDER BY timestamp
     """
+    df = pd.read_sql_query(query, conn)
+    # ISO8601: str(datetime) menghilangkan .ffffff bila mikrodetik 0, jadi format per baris bisa beda
+    df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601')
+    df['cumulative_profit'] = df['profit'].cumsum()
+    df = df[['timestamp', 'cumulative_profit']]
+    # Downsample agar Plotly menerima paling banyak MAX_CHART_POINTS titik:
+    # lebar bucket diturunkan dari rentang waktu, bukan interval tetap
+    if len(df) > MAX_CHART_POINTS:
+        span = df['timestamp'].max() - df['timestamp'].min()
+        bucket = max(span / (MAX_CHART_POINTS - 1), pd.Timedelta(seconds=1))
+        df = df.set_index('timestamp').resample(bucket, origin='start').last().dropna().reset_index()
+    return df
+
+@st.cache_data(ttl=300)
+def load_agent_list():
+    query = "SELECT DISTINCT agent_name FROM trades WHERE agent_name IS NOT NULL"
+    return pd.read_sql_query(query, conn)
+
+@st.cache_data(ttl=10)
+def load_metrics():
+    # Agregat metrik utama langsung di SQLite, satu baris hasil
+    query = """
+    SELECT COALESCE(SUM(CASE WHEN action IN ('BUY', 'SELL') THEN 1 ELSE 0 END), 0) as total_trades,
+           COALESCE(SUM(profit), 0) as total_profit,
+           COALESCE(SUM(CASE WHEN profit > 0 THEN 1 ELSE 0 END) * 100.0 / NULLIF(COUNT(profit), 0), 0) as win_rate
+    FROM trades
+    """
     return pd.read_sql_query(query, conn)
 
+# =================== FUNGSI CHART ===================
+# Figure di-cache sebagai resource (key = hash DataFrame): objek yang sama dikembalikan
+# tanpa pickle/unpickle, jadi trace tidak dibangun dan divalidasi ulang tiap rerun.
+# Figure dipakai bersama antar sesi, jadi jangan dimodifikasi setelah dibuat.
+@st.cache_resource(ttl=10)
+def build_equity_fig(equity_df):
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=equity_df['timestamp'],
+        y=equity_df['cumulative_profit'],
+        mode='lines',
+        name='Equity',
+        line=dict(color='gold', width=2)
+    ))
+    fig.update_layout(
+        height=400,
+        margin=dict(l=0, r=0, t=20, b=20),
+        yaxis_title="Profit (Rp)",
+        xaxis_title="Waktu",
+        xaxis_type="date",
+        hovermode="x unified",
+        uirevision="keep"
+    )
+    return fig
+
+@st.cache_resource(ttl=60)
+def build_leaderboard_fig(agent_perf):
+    fig = go.Figure(data=[
+        go.Bar(
+            name='Total Profit',
+            x=agent_perf['agent_name'],
+            y=agent_perf['total_profit'],
+            marker_color='lightgreen'
+        ),
+        go.Bar(
+            name='Win Rate (%)',
+            x=agent_perf['agent_name'],
+            y=agent_perf['win_rate'],
+            marker_color='gold',
+            yaxis='y2'
+        )
+    ])
+    
+    fig.update_layout(
+        height=400,
+        yaxis=dict(title="Total Profit (Rp)"),
+        yaxis2=dict(
+            title="Win Rate (%)",
+            overlaying='y',
+            side='right',
+            range=[0, 100]
+        ),
+        barmode='group',
+        margin=dict(l=0, r=0, t=20, b=20)
+    )
+    return fig
+
+@st.cache_resource(ttl=300)
+def build_sentiment_score_fig(sentiment_df):
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=sentiment_df['timestamp'],
+        y=sentiment_df['sentiment_score'],
+        mode='lines+markers',
+        name='Sentiment Score',
+        line=dict(color='orange', width=2)
+    ))
+    fig.update_layout(
+        height=300,
+        title="Sentiment Score (0-100)",
+        yaxis_range=[0, 100],
+        margin=dict(l=0, r=0, t=30, b=20),
+        xaxis_type="date",
+        hovermode="x unified",
+        uirevision="keep"
+    )
+    return fig
+
+@st.cache_resource(ttl=300)
+def build_sentiment_signal_fig(sentiment_df):
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=sentiment_df['timestamp'],
+        y=sentiment_df['signal_value'],
+        mode='lines+markers',
+        name='Signal',
+        line=dict(color='blue', width=2)
+    ))
+    fig.update_layout(
+        height=300,
+        title="Sentiment Signal (BULLISH=1, NEUTRAL=0, BEARISH=-1)",
+        yaxis_range=[-1.5, 1.5],
+        margin=dict(l=0, r=0, t=30, b=20),
+        xaxis_type="date",
+        hovermode="x unified",
+        uirevision="keep"
+    )
+    return fig
+
 # =================== SIDEBAR ===================
 st.sidebar.title("🤖 Multi-Agent Dashboard")
 st.sidebar.markdown("---")
@@ -85,9 +363,9 @@ st.sidebar.markdown("---")
 auto_refresh = st.sidebar.checkbox("Auto Refresh (10 detik)", value=True)
 refresh_interval = 10
 
+# Rerun terjadwal dari sisi browser, sesuai TTL cache (bukan loop sleep + rerun)
 if auto_refresh:
-    time.sleep(1)
-    st.rerun()
+    st_autorefresh(interval=refresh_interval * 1000, key="auto")
 
 # Filter tanggal
 st.sidebar.subheader("Filter Tanggal")
@@ -96,12 +374,6 @@ date_range = st.sidebar.date_input(
     [datetime.now() - timedelta(days=7), datetime.now()]
 )
 
-# Pilih agen
-st.sidebar.subheader("Filter Agen")
-agent_list = pd.read_sql_query("SELECT DISTINCT agent_name FROM trades WHERE agent_name IS NOT NULL", conn)
-agent_options = ['Semua'] + agent_list['agent_name'].tolist()
-selected_agent = st.sidebar.selectbox("Pilih Agen", agent_options)
-
 st.sidebar.markdown("---")
 st.sidebar.info(
     "Dashboard ini terhubung ke database bot trading. "
@@ -117,209 +389,133 @@ trades_df = load_trades()
 agent_perf = load_agent_performance()
 sentiment_df = load_sentiment_history()
 equity_df = get_equity_curve()
+metrics = load_metrics().iloc[0]
+agent_list = load_agent_list()
 
 # =================== METRIK UTAMA ===================
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    total_trades = len(trades_df[trades_df['action'].isin(['BUY', 'SELL'])])
-    st.metric("Total Trades", total_trades)
+    st.metric("Total Trades", int(metrics['total_trades']))
 
 with col2:
-    if not trades_df.empty and 'profit' in trades_df.columns:
-        total_profit = trades_df['profit'].sum()
-        st.metric("Total Profit/Loss", f"Rp{total_profit:,.0f}")
-    else:
-        st.metric("Total Profit/Loss", "Rp0")
+    st.metric("Total Profit/Loss", f"Rp{metrics['total_profit']:,.0f}")
 
 with col3:
-    if not agent_perf.empty:
-        total_wins = agent_perf['wins'].sum()
-        win_rate = (total_wins / total_trades * 100) if total_trades > 0 else 0
-        st.metric("Win Rate", f"{win_rate:.1f}%")
-    else:
-        st.metric("Win Rate", "0%")
+    st.metric("Win Rate", f"{metrics['win_rate']:.1f}%")
 
 with col4:
     if not sentiment_df.empty:
-        latest_sentiment = sentiment_df.iloc[0]['sentiment_signal']
+        latest_sentiment = sentiment_df.iloc[-1]['sentiment_signal']
         st.metric("Sentimen Terkini", latest_sentiment)
     else:
         st.metric("Sentimen Terkini", "N/A")
 
 st.markdown("---")
 
-# =================== DUA KOLOM UTAMA ===================
-left_col, right_col = st.columns(2)
+# =================== TAB ===================
+tab_overview, tab_sentiment, tab_history = st.tabs(["Overview", "Sentiment", "History"])
 
-with left_col:
-    st.subheader("📈 Equity Curve")
-    
-    if not equity_df.empty:
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=equity_df['timestamp'],
-            y=equity_df['cumulative_profit'],
-            mode='lines',
-            name='Equity',
-            line=dict(color='gold', width=2)
-        ))
-        fig.update_layout(
-            height=400,
-            margin=dict(l=0, r=0, t=20, b=20),
-            yaxis_title="Profit (Rp)",
-            xaxis_title="Waktu"
-        )
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.info("Belum ada data equity")
+# =================== DUA KOLOM UTAMA ===================
+with tab_overview:
+    left_col, right_col = st.columns(2)
 
-with right_col:
-    st.subheader("🏆 Agent Leaderboard")
-    
-    if not agent_perf.empty:
-        # Hitung win rate
-        agent_perf['win_rate'] = (agent_perf['wins'] / agent_perf['total_trades'] * 100).fillna(0)
-        agent_perf = agent_perf.sort_values('total_profit', ascending=False)
-        
-        fig = go.Figure(data=[
-            go.Bar(
-                name='Total Profit',
-                x=agent_perf['agent_name'],
-                y=agent_perf['total_profit'],
-                marker_color='lightgreen'
-            ),
-            go.Bar(
-                name='Win Rate (%)',
-                x=agent_perf['agent_name'],
-                y=agent_perf['win_rate'],
-                marker_color='gold',
-                yaxis='y2'
-            )
-        ])
+    with left_col:
+        st.subheader("📈 Equity Curve")
         
-        fig.update_layout(
-            height=400,
-            yaxis=dict(title="Total Profit (Rp)"),
-            yaxis2=dict(
-                title="Win Rate (%)",
-                overlaying='y',
-                side='right',
-                range=[0, 100]
-            ),
-            barmode='group',
-            margin=dict(l=0, r=0, t=20, b=20)
-        )
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.info("Belum ada data performa agent")
+        if not equity_df.empty:
+            st.plotly_chart(build_equity_fig(equity_df), use_container_width=True)
+        else:
+            st.info("Belum ada data equity")
 
-st.markdown("---")
+    with right_col:
+        st.subheader("🏆 Agent Leaderboard")
+        
+        if not agent_perf.empty:
+            st.plotly_chart(build_leaderboard_fig(agent_perf), use_container_width=True)
+        else:
+            st.info("Belum ada data performa agent")
 
 # =================== SENTIMEN DAN FUNDAMENTAL ===================
-st.subheader("📰 Sentimen & Fundamental Pasar")
+with tab_sentiment:
+    st.subheader("📰 Sentimen & Fundamental Pasar")
+
+    sent_col1, sent_col2 = st.columns(2)
+
+    with sent_col1:
+        if not sentiment_df.empty:
+            st.plotly_chart(build_sentiment_score_fig(sentiment_df), use_container_width=True)
+        else:
+            st.info("Belum ada data sentimen")
+
+    with sent_col2:
+        if not sentiment_df.empty:
+            st.plotly_chart(build_sentiment_signal_fig(sentiment_df), use_container_width=True)
+        else:
+            st.info("Belum ada data signal")
+
+# =================== TRADE HISTORY & AI DECISION LOGS ===================
+# Fragment: mengganti filter agen hanya me-rerun bagian ini, chart di atas tidak disentuh
+@st.fragment
+def render_trade_history(trades_df, trades_by_agent, agent_options):
+    selected_agent = st.selectbox("Pilih Agen", agent_options)
+
+    # Filter berdasarkan agen: slice diambil dari GroupBy hanya saat agen dipilih
+    if selected_agent != 'Semua':
+        try:
+            filtered_trades = trades_by_agent.get_group(selected_agent)
+        except KeyError:
+            # Agen tidak punya trade di 100 baris terakhir
+            filtered_trades = trades_df.iloc[:0]
+    else:
+        filtered_trades = trades_df
 
-sent_col1, sent_col2 = st.columns(2)
+    st.subheader("📜 Trade History")
 
-with sent_col1:
-    if not sentiment_df.empty:
-        sentiment_df['timestamp'] = pd.to_datetime(sentiment_df['timestamp'])
-        sentiment_df = sentiment_df.sort_values('timestamp')
+    # Tampilkan tabel
+    if not filtered_trades.empty:
+        # Format kolom untuk tampilan
+        display_cols = ['timestamp', 'action', 'entry', 'sl', 'tp', 'exit_price', 'profit', 'agent_name', 'confidence']
+        # Angka sudah dibulatkan di query load_trades
+        display_df = filtered_trades[display_cols]
         
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=sentiment_df['timestamp'],
-            y=sentiment_df['sentiment_score'],
-            mode='lines+markers',
-            name='Sentiment Score',
-            line=dict(color='orange', width=2)
-        ))
-        fig.update_layout(
-            height=300,
-            title="Sentiment Score (0-100)",
-            yaxis_range=[0, 100],
-            margin=dict(l=0, r=0, t=30, b=20)
+        # Warna berdasarkan profit (vektor, satu pass per kolom)
+        def color_profit_col(s):
+            # Kolom Arrow bisa berisi <NA>; ubah ke float (NaN) sebelum dibandingkan
+            profit = s.to_numpy(dtype=float, na_value=np.nan)
+            return np.where(profit > 0, 'color: green', np.where(profit < 0, 'color: red', 'color: black'))
+        
+        st.dataframe(
+            display_df.style.apply(color_profit_col, subset=['profit']),
+            use_container_width=True,
+            height=400
         )
-        st.plotly_chart(fig, use_container_width=True)
     else:
-        st.info("Belum ada data sentimen")
-
-with sent_col2:
-    if not sentiment_df.empty:
-        # Map signal ke angka untuk visualisasi
-        signal_map = {'BULLISH': 1, 'NEUTRAL': 0, 'BEARISH': -1}
-        sentiment_df['signal_value'] = sentiment_df['sentiment_signal'].map(signal_map).fillna(0)
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=sentiment_df['timestamp'],
-            y=sentiment_df['signal_value'],
-            mode='lines+markers',
-            name='Signal',
-            line=dict(color='blue', width=2)
-        ))
-        fig.update_layout(
-            height=300,
-            title="Sentiment Signal (BULLISH=1, NEUTRAL=0, BEARISH=-1)",
-            yaxis_range=[-1.5, 1.5],
-            margin=dict(l=0, r=0, t=30, b=20)
+        st.info("Belum ada data trade")
+
+    st.subheader("🧠 AI Decision Logs")
+
+    if not filtered_trades.empty and 'reason' in filtered_trades.columns:
+        # Tampilkan 5 trade terakhir dengan reasoning dalam satu tabel (tanpa iterrows)
+        log_cols = ['timestamp', 'action', 'agent_name', 'confidence', 'reason']
+        logs_df = filtered_trades.head(5)[log_cols]
+        st.dataframe(
+            logs_df,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'confidence': st.column_config.NumberColumn(format="%.2f"),
+                'reason': st.column_config.TextColumn(width="large")
+            }
         )
-        st.plotly_chart(fig, use_container_width=True)
     else:
-        st.info("Belum ada data signal")
-
-st.markdown("---")
-
-# =================== TRADE HISTORY ===================
-st.subheader("📜 Trade History")
-
-# Filter berdasarkan agen
-if selected_agent != 'Semua':
-    filtered_trades = trades_df[trades_df['agent_name'] == selected_agent]
-else:
-    filtered_trades = trades_df
-
-# Tampilkan tabel
-if not filtered_trades.empty:
-    # Format kolom untuk tampilan
-    display_cols = ['timestamp', 'action', 'entry', 'sl', 'tp', 'exit_price', 'profit', 'agent_name', 'confidence']
-    display_df = filtered_trades[display_cols].copy()
-    
-    # Format angka
-    display_df['entry'] = display_df['entry'].round(2)
-    display_df['sl'] = display_df['sl'].round(2)
-    display_df['tp'] = display_df['tp'].round(2)
-    display_df['exit_price'] = display_df['exit_price'].round(2)
-    display_df['profit'] = display_df['profit'].round(0)
-    display_df['confidence'] = display_df['confidence'].round(2)
-    
-    # Warna berdasarkan profit
-    def color_profit(val):
-        color = 'green' if val > 0 else 'red' if val < 0 else 'black'
-        return f'color: {color}'
-    
-    st.dataframe(
-        display_df.style.applymap(color_profit, subset=['profit']),
-        use_container_width=True,
-        height=400
-    )
-else:
-    st.info("Belum ada data trade")
-
-st.markdown("---")
+        st.info("Belum ada decision logs")
 
-# =================== AI DECISION LOGS ===================
-st.subheader("🧠 AI Decision Logs")
-
-if not filtered_trades.empty and 'reason' in filtered_trades.columns:
-    # Tampilkan 5 trade terakhir dengan reasoning
-    for idx, row in filtered_trades.head(5).iterrows():
-        with st.expander(f"{row['timestamp']} - {row['action']} by {row['agent_name']} (Conf: {row['confidence']:.2f})"):
-            st.write(f"**Reason:** {row.get('reason', 'No reason provided')}")
-            if pd.notna(row.get('reflection')):
-                st.write(f"**Reflection:** {row['reflection']}")
-else:
-    st.info("Belum ada decision logs")
+with tab_history:
+    agent_options = ['Semua'] + agent_list['agent_name'].tolist()
+    # GroupBy lazy: tidak menyalin slice apa pun sampai get_group dipanggil di fragment
+    trades_by_agent = trades_df.groupby('agent_name', observed=True)
+    render_trade_history(trades_df, trades_by_agent, agent_options)
 
 # Footer
 st.markdown("---")